@@ -1,8 +1,15 @@
 """Modules package for PhoneTracer
 
 This package contains intelligence gathering modules for phone number analysis.
+Submodules are imported lazily on first attribute access, so importing the
+package does not pull in their HTTP dependencies.
 """
 
-from .social_media import detect_social_media
+__all__ = ['detect_social_media', 'adetect_social_media']
 
-__all__ = ['detect_social_media']
+
+def __getattr__(name):
+    if name in __all__:
+        from . import social_media
+        return getattr(social_media, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,69 @@
+"""Retry policy for calls to external services
+
+Shared by the intelligence modules and PhoneTracer. This module only
+depends on tenacity; HTTP exception types are recognised without importing
+an HTTP client.
+"""
+
+import logging
+import sys
+
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying: rate limiting and server errors
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Decide whether a failed call is worth retrying
+
+    Timeouts, network errors, protocol errors from the server and 429/5xx
+    responses are transient. Other HTTP errors such as 401, 403 or 404
+    are permanent.
+
+    Args:
+        exc: Exception raised by the call
+
+    Returns:
+        True if the call should be retried
+    """
+    # asyncio and httpx exceptions can only exist if those modules were
+    # already imported, so neither is imported here
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is not None and isinstance(exc, asyncio.TimeoutError):
+        return True
+
+    httpx = sys.modules.get('httpx')
+    if httpx is None:
+        return False
+    # Other transport errors, such as UnsupportedProtocol or
+    # LocalProtocolError, come from the request itself and would fail again
+    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUS_CODES
+    return False
+
+
+def _log_retry(retry_state):
+    """Log a retried external call at DEBUG level"""
+    logger.debug(
+        "Retrying %s (attempt %d failed: %s)",
+        retry_state.fn.__name__,
+        retry_state.attempt_number,
+        retry_state.outcome.exception()
+    )
+
+
+# Retry transient failures with jittered exponential backoff, up to five
+# attempts. Works on both plain functions and coroutines.
+retry_external = retry(
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception(is_transient),
+    before_sleep=_log_retry,
+    reraise=True
+)
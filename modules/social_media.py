@@ -4,73 +4,321 @@ This module attempts to detect if a phone number is associated with various
 social media platforms using publicly available methods.
 """
 
+import asyncio
+import atexit
+import logging
 import re
+import threading
 import time
-from typing import Dict, List
+from typing import Awaitable, Dict, List, Optional
+
+import httpx
+from aiolimiter import AsyncLimiter
+
+from ._retry import retry_external
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of checks allowed in flight at once against one platform
+MAX_CONCURRENT_CHECKS = 64
+
+# Default per-request timeout (seconds)
+DEFAULT_TIMEOUT = 30
+
+# Default outbound request budget (requests per minute)
+DEFAULT_RATE_LIMIT = 60
+
+
+# Shared HTTP clients, one per event loop. Clients are built lazily and
+# reused across calls so connections survive between checks.
+_CLIENTS: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+# Background event loop driving the synchronous entry point
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_THREAD: Optional[threading.Thread] = None
+_LOCK = threading.Lock()
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client of the running event loop
+    
+    The client speaks HTTP/2, so concurrent checks against the same host
+    are multiplexed over one connection. Must be called from within a
+    running event loop. Callers running their own loop must await
+    aclose_client() before it ends: a client left behind by a closed loop
+    can no longer be closed, so it is dropped with a warning and its
+    pooled connections leak.
+    The client is shared by all detectors, so its DEFAULT_TIMEOUT only
+    applies to requests that do not set their own; detectors pass their
+    configured timeout on every request.
+    
+    Returns:
+        Shared httpx async client
+    """
+    loop = asyncio.get_running_loop()
+    with _LOCK:
+        for stale in [other for other in _CLIENTS if other.is_closed()]:
+            if not _CLIENTS.pop(stale).is_closed:
+                logger.warning(
+                    "Dropping an HTTP client whose event loop closed without "
+                    "aclose_client(); its connections were not closed"
+                )
+        client = _CLIENTS.get(loop)
+        if client is None or client.is_closed:
+            client = _CLIENTS[loop] = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=20,
+                    keepalive_expiry=75
+                ),
+                timeout=DEFAULT_TIMEOUT
+            )
+    return client
+
+
+async def aclose_client():
+    """
+    Close the shared HTTP client of the running event loop
+    
+    Async callers should await this before their event loop ends so the
+    client's connections are shut down cleanly.
+    """
+    with _LOCK:
+        client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create an event loop, using the libuv-based uvloop where installed
+    
+    Returns:
+        New event loop
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the event loop used by the synchronous entry point
+    
+    The loop runs forever in a daemon thread, so it can be used from any
+    thread, including one that is already running an event loop.
+    
+    Returns:
+        Long-lived event loop owning the shared client
+    """
+    global _LOOP, _LOOP_THREAD
+    with _LOCK:
+        if _LOOP is None or _LOOP.is_closed():
+            _LOOP = _new_event_loop()
+            _LOOP_THREAD = threading.Thread(
+                target=_LOOP.run_forever, name='social-media-loop', daemon=True
+            )
+            _LOOP_THREAD.start()
+        return _LOOP
+
+
+def _tighten_limiter(limiter: AsyncLimiter, headers) -> Optional[float]:
+    """
+    Slow a limiter down when a server reports it is close to its cap
+    
+    Reads X-RateLimit-Remaining / X-RateLimit-Reset response headers and
+    sets the limiter rate so the remaining budget is spread evenly until
+    the reset. The rate never exceeds the limiter's configured rate.
+    
+    Args:
+        limiter: Limiter to adjust
+        headers: Response headers
+        
+    Returns:
+        time.monotonic() deadline after which the configured rate should be
+        restored, or None if the headers carry no rate limit information
+    """
+    try:
+        remaining = int(headers['X-RateLimit-Remaining'])
+        reset = float(headers['X-RateLimit-Reset'])
+    except (KeyError, ValueError):
+        return None
+    
+    # Reset may be given as an epoch timestamp or as seconds from now
+    if reset > time.time():
+        reset -= time.time()
+    reset = max(reset, 1.0)
+    limiter._rate_per_sec = min(max(remaining, 1) / reset, _base_rate(limiter))
+    return time.monotonic() + reset
+
+
+def _base_rate(limiter: AsyncLimiter) -> float:
+    """Get the configured rate of a limiter in requests per second"""
+    return limiter.max_rate / limiter.time_period
+
+
+@atexit.register
+def _close_client():
+    """Close the shared HTTP clients and the background loop at interpreter exit"""
+    with _LOCK:
+        clients = list(_CLIENTS.items())
+        _CLIENTS.clear()
+    for loop, client in clients:
+        if client.is_closed or loop.is_closed():
+            continue
+        if loop.is_running():
+            # Only the background loop can still be running at exit
+            if loop is _LOOP:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        else:
+            loop.run_until_complete(client.aclose())
+    if _LOOP is not None and not _LOOP.is_closed():
+        _LOOP.call_soon_threadsafe(_LOOP.stop)
+        _LOOP_THREAD.join(timeout=5)
+        if not _LOOP.is_running():
+            _LOOP.close()
 
 
 class SocialMediaDetector:
     """Detect phone number associations with social media platforms"""
     
-    def __init__(self):
-        self.platforms = [
-            'WhatsApp',
-            'Telegram',
-            'Signal',
-            'Viber',
-            'Facebook',
-            'Instagram',
-            'Twitter/X',
-            'Snapchat',
-            'TikTok',
-            'LinkedIn'
-        ]
+    PLATFORMS = (
+        'WhatsApp',
+        'Telegram',
+        'Signal',
+        'Viber',
+        'Facebook',
+        'Instagram',
+        'Twitter/X',
+        'Snapchat',
+        'TikTok',
+        'LinkedIn'
+    )
+    
+    # Platforms with a dedicated registration check
+    MESSAGING = ('WhatsApp', 'Telegram', 'Signal')
+    
+    # Platforms covered by the generic check
+    GENERIC = tuple(sorted(set(PLATFORMS) - set(MESSAGING), key=PLATFORMS.index))
+    
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_CHECKS,
+                 rate_limit: int = DEFAULT_RATE_LIMIT,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._limiter = AsyncLimiter(rate_limit, 60)
+        
+        # time.monotonic() deadline at which a server-imposed slowdown ends
+        self._throttled_until: Optional[float] = None
+        
+        # One semaphore per platform, shared by every concurrent call.
+        # Semaphores belong to an event loop, so they are rebuilt when
+        # the detector is used from a different loop.
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _semaphore(self, platform: str) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding in-flight checks against a platform
+        
+        Args:
+            platform: Platform name
+            
+        Returns:
+            Semaphore with ``max_concurrency`` slots
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore_loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(platform)
+        if semaphore is None:
+            semaphore = self._semaphores[platform] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
     
-    def check_all_platforms(self, phone_number: str) -> Dict:
+    async def check_all_platforms(self, phone_number: str) -> Dict:
         """
         Check phone number across all supported platforms
         
+        All platform checks are issued concurrently over the shared HTTP
+        client. Checks against each platform are bounded to
+        ``max_concurrency`` in flight across all concurrent calls. A
+        failed check is reported as an error entry for its platform.
+        
         Args:
             phone_number: Phone number to check
             
         Returns:
             Dictionary with platform detection results
         """
-        results = {
+        async def bounded(platform: str, check: Awaitable[Dict]) -> Dict:
+            async with self._semaphore(platform):
+                return await check
+        
+        # (platform, pending check, result key marking the platform as found)
+        client = get_client()
+        checks = [
+            ('WhatsApp', self._check_whatsapp(client, phone_number), 'registered'),
+            ('Telegram', self._check_telegram(client, phone_number), 'registered'),
+            ('Signal', self._check_signal(client, phone_number), 'registered'),
+            *(
+                (platform, self._check_generic_platform(client, phone_number, platform), 'possible')
+                for platform in self.GENERIC
+            )
+        ]
+        outcomes = await asyncio.gather(
+            *[bounded(platform, check) for platform, check, _ in checks],
+            return_exceptions=True
+        )
+        details = {}
+        for (platform, _, _), outcome in zip(checks, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("Error checking %s: %s", platform, outcome)
+                outcome = {'error': str(outcome)}
+            details[platform] = outcome
+        
+        return {
             'phone_number': phone_number,
-            'platforms_found': [],
-            'platforms_checked': self.platforms,
-            'details': {}
+            'platforms_found': [platform for platform, _, found in checks if details[platform].get(found)],
+            'platforms_checked': self.PLATFORMS,
+            'details': details
         }
+    
+    async def _fetch(self, client: httpx.AsyncClient, url: str, **kwargs) -> Dict:
+        """
+        Perform a rate-limited GET request and decode the JSON response
+        
+        Every outbound platform request goes through here so that all
+        checks share the detector's rate limiter. The limiter follows any
+        rate limit headers the server sends and returns to its configured
+        rate once the server's reset time has passed.
         
-        # WhatsApp detection
-        whatsapp_result = self._check_whatsapp(phone_number)
-        if whatsapp_result['registered']:
-            results['platforms_found'].append('WhatsApp')
-        results['details']['WhatsApp'] = whatsapp_result
-        
-        # Telegram detection
-        telegram_result = self._check_telegram(phone_number)
-        if telegram_result['registered']:
-            results['platforms_found'].append('Telegram')
-        results['details']['Telegram'] = telegram_result
-        
-        # Signal detection
-        signal_result = self._check_signal(phone_number)
-        if signal_result['registered']:
-            results['platforms_found'].append('Signal')
-        results['details']['Signal'] = signal_result
-        
-        # Other platforms (limited detection)
-        for platform in ['Viber', 'Facebook', 'Instagram', 'Twitter/X', 'Snapchat', 'TikTok', 'LinkedIn']:
-            result = self._check_generic_platform(phone_number, platform)
-            if result['possible']:
-                results['platforms_found'].append(platform)
-            results['details'][platform] = result
-        
-        return results
-    
-    def _check_whatsapp(self, phone_number: str) -> Dict:
+        Args:
+            client: HTTP client to use
+            url: URL to request
+            **kwargs: Extra arguments passed to client.get()
+            
+        Returns:
+            Decoded JSON response body
+        """
+        if self._throttled_until is not None and time.monotonic() >= self._throttled_until:
+            self._limiter._rate_per_sec = _base_rate(self._limiter)
+            self._throttled_until = None
+        
+        async with self._limiter:
+            response = await client.get(url, timeout=self.timeout, **kwargs)
+            throttled_until = _tighten_limiter(self._limiter, response.headers)
+            if throttled_until is not None:
+                self._throttled_until = throttled_until
+            response.raise_for_status()
+            return response.json()
+    
+    @retry_external
+    async def _check_whatsapp(self, client: httpx.AsyncClient, phone_number: str) -> Dict:
         """
         Check WhatsApp registration
         
@@ -86,7 +334,8 @@ class SocialMediaDetector:
             'note': 'Requires WhatsApp Business API or third-party service'
         }
     
-    def _check_telegram(self, phone_number: str) -> Dict:
+    @retry_external
+    async def _check_telegram(self, client: httpx.AsyncClient, phone_number: str) -> Dict:
         """
         Check Telegram registration
         
@@ -99,7 +348,8 @@ class SocialMediaDetector:
             'note': 'Requires Telegram API credentials'
         }
     
-    def _check_signal(self, phone_number: str) -> Dict:
+    @retry_external
+    async def _check_signal(self, client: httpx.AsyncClient, phone_number: str) -> Dict:
         """
         Check Signal registration
         
@@ -112,7 +362,9 @@ class SocialMediaDetector:
             'note': 'Signal prioritizes privacy - limited detection possible'
         }
     
-    def _check_generic_platform(self, phone_number: str, platform: str) -> Dict:
+    @retry_external
+    async def _check_generic_platform(self, client: httpx.AsyncClient,
+                                      phone_number: str, platform: str) -> Dict:
         """
         Generic platform check
         
@@ -127,15 +379,46 @@ class SocialMediaDetector:
         }
 
 
-def detect_social_media(phone_number: str) -> Dict:
+# Detector used when the caller does not pass one, so its rate limiter
+# persists across calls
+_DETECTOR = SocialMediaDetector()
+
+
+async def adetect_social_media(phone_number: str,
+                               detector: Optional[SocialMediaDetector] = None) -> Dict:
+    """
+    Detect social media associations from within a running event loop
+    
+    The checks use the shared HTTP client of the running loop. Await
+    aclose_client() before the loop ends to close its connections.
+    
+    Args:
+        phone_number: Phone number to check
+        detector: Detector to use; defaults to one with the default limits
+        
+    Returns:
+        Detection results dictionary
+    """
+    return await (detector or _DETECTOR).check_all_platforms(phone_number)
+
+
+def detect_social_media(phone_number: str,
+                        detector: Optional[SocialMediaDetector] = None) -> Dict:
     """
     Main function to detect social media associations
     
+    Synchronous entry point that runs the async platform checks on the
+    shared background event loop. Safe to call from any thread; async
+    code should await adetect_social_media() instead.
+    
     Args:
         phone_number: Phone number to check
+        detector: Detector to use; defaults to one with the default limits
         
     Returns:
         Detection results dictionary
     """
-    detector = SocialMediaDetector()
-    return detector.check_all_platforms(phone_number)
+    future = asyncio.run_coroutine_threadsafe(
+        adetect_social_media(phone_number, detector), _get_loop()
+    )
+    return future.result()
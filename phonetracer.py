@@ -10,14 +10,41 @@ License: MIT
 """
 
 import argparse
+import functools
+import hashlib
+import itertools
 import sys
 import json
-from typing import Dict, List, Optional
+import mmap
+import os
+import re
+import stat
+import threading
+import time
+import types
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
-from colorama import Fore, Style, init
+import phonenumbers
+from modules._retry import retry_external
 
-# Initialize colorama for cross-platform colored output
-init(autoreset=True)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Initialize colorama for cross-platform colored output. When output is
+# piped, skip it entirely and print plain text.
+if sys.stdout.isatty():
+    from colorama import Fore, Style, init
+    init(autoreset=True)
+else:
+    Fore = types.SimpleNamespace(CYAN='', GREEN='', YELLOW='', RED='')
+    Style = types.SimpleNamespace(RESET_ALL='')
 
 # Configure logging
 logging.basicConfig(
@@ -26,19 +53,255 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Batch processing limits: traces in flight and traces started per second
+BATCH_MAX_AT_ONCE = 64
+BATCH_MAX_PER_SECOND = 30
+
+# Phone numbers handed to a worker process at a time
+BATCH_CHUNKSIZE = 32
+
+# Bytes of the batch file split into lines at a time
+BATCH_READ_BLOCK = 1 << 20
+
+# Digits a phone number may have (E.164 allows at most 15)
+MIN_DIGITS = 7
+MAX_DIGITS = 15
+
+# Modules a tracer runs at once in trace()
+MAX_MODULE_WORKERS = 8
+
+# Seconds to wait on the Redis cache before giving up
+CACHE_TIMEOUT = 2
+
+# Cheap shape check run before handing input to phonenumbers
+_PHONE_RE = re.compile(r'^\+?[0-9 \-().]{7,20}$')
+
+
+@functools.lru_cache(maxsize=None)
+def _get_numpy():
+    """
+    Import NumPy on first use
+    
+    NumPy only speeds up batch prefiltering and column exports, so it is
+    not imported for single-number runs.
+    
+    Returns:
+        The numpy module, or None if it is not installed
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _dumps(obj, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON, using orjson when available
+    
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _loads(data):
+    """
+    Deserialize JSON, using orjson when available
+    
+    Args:
+        data: JSON document as bytes or str
+        
+    Returns:
+        Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=4)
+def _timestamp_for_second(second: int) -> str:
+    """
+    Format a Unix time as an ISO timestamp
+    
+    Cached so that traces finishing within the same second share one
+    formatted string.
+    
+    Args:
+        second: Seconds since the epoch
+        
+    Returns:
+        ISO format UTC timestamp
+    """
+    return datetime.fromtimestamp(second, tz=timezone.utc).isoformat()
+
+
+def _parse_number(phone_number: str) -> Optional[Dict]:
+    """
+    Parse phone number using phonenumbers library
+    
+    Kept at module scope so it can be used from worker processes. Input
+    that cannot be a phone number is rejected before reaching
+    phonenumbers.
+    
+    Args:
+        phone_number: Phone number to parse
+        
+    Returns:
+        Parsed number information or None
+    """
+    if not _PHONE_RE.match(phone_number):
+        return None
+    
+    try:
+        parsed = phonenumbers.parse(phone_number, None)
+        return {
+            'country_code': parsed.country_code,
+            'national_number': parsed.national_number,
+            'e164': phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164),
+            'is_valid': phonenumbers.is_valid_number(parsed),
+            'is_possible': phonenumbers.is_possible_number(parsed)
+        }
+    except Exception as e:
+        logger.error("Error parsing number: %s", e)
+        return None
+
+
+@dataclass
+class BatchResults:
+    """
+    Column-oriented store for batch trace results
+    
+    Parsed fields are kept in one typed column each instead of a dict per
+    number, so exports and filters work on whole columns at once.
+    Per-module data is not stored here; use JSON output for that.
+    """
+    phone_numbers: List[str] = field(default_factory=list)
+    timestamps: List[str] = field(default_factory=list)
+    e164: List[str] = field(default_factory=list)
+    country_codes: array = field(default_factory=lambda: array('i'))
+    national_numbers: array = field(default_factory=lambda: array('q'))
+    is_valid: array = field(default_factory=lambda: array('b'))
+    is_possible: array = field(default_factory=lambda: array('b'))
+    
+    # Output formats written from columns rather than JSON
+    FORMATS = ('csv', 'parquet')
+    
+    def __len__(self) -> int:
+        return len(self.phone_numbers)
+    
+    def append(self, result: Dict):
+        """
+        Add one trace result
+        
+        Args:
+            result: Result returned by PhoneTracer.trace()
+        """
+        parsed = result['data'].get('parsed') or {}
+        self.phone_numbers.append(result['phone_number'])
+        self.timestamps.append(result['timestamp'])
+        self.e164.append(parsed.get('e164', ''))
+        self.country_codes.append(parsed.get('country_code', 0))
+        self.national_numbers.append(parsed.get('national_number', 0))
+        self.is_valid.append(parsed.get('is_valid', False))
+        self.is_possible.append(parsed.get('is_possible', False))
+    
+    def columns(self) -> Dict:
+        """
+        Get the results as named columns
+        
+        Numeric and boolean columns are NumPy arrays when NumPy is
+        installed, and plain lists otherwise. The arrays are copies, so
+        results can still be appended afterwards.
+        
+        Returns:
+            Mapping of column name to column values
+        """
+        numeric = {
+            'country_code': (self.country_codes, 'int32'),
+            'national_number': (self.national_numbers, 'int64'),
+            'is_valid': (self.is_valid, 'bool'),
+            'is_possible': (self.is_possible, 'bool'),
+        }
+        np = _get_numpy()
+        columns = {
+            'phone_number': self.phone_numbers,
+            'timestamp': self.timestamps,
+            'e164': self.e164,
+        }
+        for name, (values, dtype) in numeric.items():
+            if np is not None:
+                columns[name] = np.array(values, dtype=dtype)
+            elif dtype == 'bool':
+                columns[name] = [bool(v) for v in values]
+            else:
+                columns[name] = values.tolist()
+        return columns
+    
+    def invalid_numbers(self) -> List[str]:
+        """
+        Get the phone numbers that did not validate
+        
+        Returns:
+            Phone numbers whose is_valid flag is false
+        """
+        np = _get_numpy()
+        if np is not None and len(self):
+            invalid = np.flatnonzero(np.frombuffer(self.is_valid, dtype='bool') == 0)
+            return [self.phone_numbers[i] for i in invalid]
+        return [n for n, valid in zip(self.phone_numbers, self.is_valid) if not valid]
+    
+    def export(self, output_format: str, output_file: Optional[str] = None):
+        """
+        Export the columns as CSV or Parquet
+        
+        Args:
+            output_format: Format (csv, parquet)
+            output_file: Output file path; CSV is printed when omitted
+        """
+        if output_format == 'parquet':
+            if not output_file:
+                raise ValueError("Parquet export requires an output file")
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.Table.from_pydict(self.columns()), output_file)
+        elif output_format == 'csv':
+            import pandas as pd
+            output = pd.DataFrame(self.columns()).to_csv(output_file, index=False)
+            if output is not None:
+                print(output, end='')
+        else:
+            raise ValueError(f"Unsupported columnar format: {output_format}")
+
 
 class PhoneTracer:
     """Main class for PhoneTracer application"""
     
-    def __init__(self, config_file: Optional[str] = None):
+    def __init__(self, config_file: Optional[str] = None, config: Optional[Dict] = None):
         """
         Initialize PhoneTracer
         
         Args:
             config_file: Path to configuration file
+            config: Already loaded configuration, used instead of config_file
         """
-        self.config = self._load_config(config_file)
+        self.config = config if config is not None else self._load_config(config_file)
         self.results = {}
+        self._cache_errors = ()
+        self.cache = self._connect_cache()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._social_media = None
         
     def _load_config(self, config_file: Optional[str]) -> Dict:
         """
@@ -54,6 +317,8 @@ class PhoneTracer:
             'timeout': 30,
             'rate_limit': 60,
             'cache_enabled': True,
+            'cache_url': None,
+            'cache_ttl': 86400,
             'verbose': False
         }
         
@@ -61,39 +326,135 @@ class PhoneTracer:
             try:
                 with open(config_file, 'r') as f:
                     import yaml
-                    user_config = yaml.safe_load(f)
+                    try:
+                        # libyaml C binding, when PyYAML was built with it
+                        from yaml import CSafeLoader as Loader
+                    except ImportError:
+                        from yaml import SafeLoader as Loader
+                    user_config = yaml.load(f, Loader=Loader)
                     default_config.update(user_config.get('settings', {}))
             except FileNotFoundError:
-                logger.warning(f"Config file {config_file} not found. Using defaults.")
+                logger.warning("Config file %s not found. Using defaults.", config_file)
             except Exception as e:
-                logger.error(f"Error loading config: {e}")
+                logger.error("Error loading config: %s", e)
         
         return default_config
     
-    def trace(self, phone_number: str, modules: Optional[List[str]] = None) -> Dict:
+    def _connect_cache(self):
         """
-        Trace phone number information
+        Create the Redis client used to cache trace results
+        
+        Caching needs both cache_enabled and a cache_url in the settings.
+        
+        Returns:
+            Redis client, or None if caching is disabled or unavailable
+        """
+        if not (self.config['cache_enabled'] and self.config['cache_url']):
+            return None
+        try:
+            import redis
+        except ImportError:
+            logger.warning("redis package not installed. Result caching disabled.")
+            return None
+        self._cache_errors = (redis.RedisError,)
+        return redis.Redis.from_url(
+            self.config['cache_url'],
+            socket_connect_timeout=CACHE_TIMEOUT,
+            socket_timeout=CACHE_TIMEOUT
+        )
+    
+    def _cache_key(self, e164: str, modules: List[str]) -> bytes:
+        """
+        Build the cache key for a trace
         
         Args:
-            phone_number: Phone number to trace
-            modules: List of modules to use (carrier, location, spam, validator)
+            e164: Phone number in E.164 format
+            modules: Modules run for the trace
             
         Returns:
-            Dictionary containing gathered intelligence
+            Cache key
+        """
+        digest = hashlib.sha1(f"{e164}|{','.join(sorted(modules))}".encode()).digest()
+        return b'pt:' + digest
+    
+    def _cache_get(self, key: bytes) -> Optional[Dict]:
         """
-        logger.info(f"Tracing phone number: {phone_number}")
+        Look up cached trace data
         
-        results = {
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached trace data or None on a miss
+        """
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(key)
+        except self._cache_errors as e:
+            logger.warning("Cache unavailable, disabling: %s", e)
+            self.cache = None
+            return None
+        return _loads(cached) if cached is not None else None
+    
+    def _cache_set(self, key: bytes, data: Dict):
+        """
+        Store trace data in the cache
+        
+        Args:
+            key: Cache key
+            data: Trace data to store
+        """
+        if self.cache is None:
+            return
+        try:
+            self.cache.setex(key, self.config['cache_ttl'], _dumps(data))
+        except self._cache_errors as e:
+            logger.warning("Cache unavailable, disabling: %s", e)
+            self.cache = None
+    
+    def rejected(self, phone_number: str) -> Dict:
+        """
+        Build the results for a phone number that failed validation
+        
+        Args:
+            phone_number: Invalid phone number
+            
+        Returns:
+            Results with no gathered data
+        """
+        logger.error("Invalid phone number format: %s", phone_number)
+        return {
             'phone_number': phone_number,
             'timestamp': self._get_timestamp(),
             'data': {}
         }
+    
+    def _start_trace(self, phone_number: str,
+                     modules: Optional[List[str]]) -> Tuple[Dict, List[str], Optional[bytes]]:
+        """
+        Prepare a trace: parse the number and consult the cache
+        
+        Args:
+            phone_number: Phone number to trace
+            modules: Requested modules, or None for the defaults
+            
+        Returns:
+            Tuple of (results, modules still to run, cache key). No
+            modules are left to run for invalid numbers or cache hits.
+        """
+        logger.info("Tracing phone number: %s", phone_number)
         
         # Parse and validate phone number
-        parsed = self._parse_number(phone_number)
+        parsed = _parse_number(phone_number)
         if not parsed:
-            logger.error("Invalid phone number format")
-            return results
+            return self.rejected(phone_number), [], None
+        
+        results = {
+            'phone_number': phone_number,
+            'timestamp': self._get_timestamp(),
+            'data': {}
+        }
         
         results['data']['parsed'] = parsed
         
@@ -101,46 +462,129 @@ class PhoneTracer:
         if modules is None:
             modules = ['validator', 'carrier', 'location']
         
-        # Run each module
+        # Serve repeated traces from the cache. Only the data is cached,
+        # so the number and timestamp always describe this trace.
+        cache_key = self._cache_key(parsed['e164'], modules)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info("Cache hit for %s", phone_number)
+            results['data'] = cached
+            return results, [], None
+        
+        return results, modules, cache_key
+    
+    def _finish_trace(self, results: Dict, modules: List[str], module_results: Dict,
+                      cache_key: Optional[bytes]) -> Dict:
+        """
+        Collect module results into the trace results and cache them
+        
+        Traces with a failed module are not cached, so a transient
+        upstream error is not served for the whole cache_ttl.
+        
+        Args:
+            results: Results returned by _start_trace()
+            modules: Modules that were run
+            module_results: Result (or error entry) per module
+            cache_key: Cache key returned by _start_trace()
+            
+        Returns:
+            Completed trace results
+        """
+        # Keep modules in the order they were requested
         for module_name in modules:
-            try:
-                module_result = self._run_module(module_name, phone_number)
-                results['data'][module_name] = module_result
-                logger.info(f"Module {module_name} completed")
-            except Exception as e:
-                logger.error(f"Error in module {module_name}: {e}")
-                results['data'][module_name] = {'error': str(e)}
+            results['data'][module_name] = module_results[module_name]
         
-        self.results = results
+        failed = any('error' in module_results[module_name] for module_name in modules)
+        if cache_key is not None and not failed:
+            self._cache_set(cache_key, results['data'])
         return results
     
-    def _parse_number(self, phone_number: str) -> Optional[Dict]:
+    def trace(self, phone_number: str, modules: Optional[List[str]] = None) -> Dict:
         """
-        Parse phone number using phonenumbers library
+        Trace phone number information
         
         Args:
-            phone_number: Phone number to parse
+            phone_number: Phone number to trace
+            modules: List of modules to use (carrier, location, social, spam, validator)
             
         Returns:
-            Parsed number information or None
+            Dictionary containing gathered intelligence
         """
-        try:
-            import phonenumbers
-            parsed = phonenumbers.parse(phone_number, None)
-            return {
-                'country_code': parsed.country_code,
-                'national_number': parsed.national_number,
-                'is_valid': phonenumbers.is_valid_number(parsed),
-                'is_possible': phonenumbers.is_possible_number(parsed)
+        results, modules, cache_key = self._start_trace(phone_number, modules)
+        
+        # Run modules concurrently; they are independent and I/O-bound
+        module_results = {}
+        if modules:
+            executor = self._module_executor()
+            futures = {
+                executor.submit(self._run_module, module_name, phone_number): module_name
+                for module_name in modules
             }
-        except Exception as e:
-            logger.error(f"Error parsing number: {e}")
-            return None
+            for future in as_completed(futures):
+                module_name = futures[future]
+                try:
+                    module_results[module_name] = future.result()
+                    logger.info("Module %s completed", module_name)
+                except Exception as e:
+                    logger.error("Error in module %s: %s", module_name, e)
+                    module_results[module_name] = {'error': str(e)}
+        
+        self.results = self._finish_trace(results, modules, module_results, cache_key)
+        return self.results
+    
+    async def atrace(self, phone_number: str, modules: Optional[List[str]] = None) -> Dict:
+        """
+        Trace phone number information asynchronously
+        
+        Async counterpart of trace(); modules run concurrently. Unlike
+        trace(), results are not stored on self.results since several
+        traces may be in flight at once. Cache lookups and writes run in
+        the default executor, as the Redis client blocks.
+        
+        Args:
+            phone_number: Phone number to trace
+            modules: List of modules to use (carrier, location, social, spam, validator)
+            
+        Returns:
+            Dictionary containing gathered intelligence
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        if self.cache is None:
+            results, modules, cache_key = self._start_trace(phone_number, modules)
+        else:
+            results, modules, cache_key = await loop.run_in_executor(
+                None, self._start_trace, phone_number, modules
+            )
+        
+        # Run all modules concurrently
+        outcomes = await asyncio.gather(
+            *[self._arun_module(module_name, phone_number) for module_name in modules],
+            return_exceptions=True
+        )
+        module_results = {}
+        for module_name, outcome in zip(modules, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("Error in module %s: %s", module_name, outcome)
+                module_results[module_name] = {'error': str(outcome)}
+            else:
+                module_results[module_name] = outcome
+                logger.info("Module %s completed", module_name)
+        
+        if self.cache is None:
+            return self._finish_trace(results, modules, module_results, cache_key)
+        return await loop.run_in_executor(
+            None, self._finish_trace, results, modules, module_results, cache_key
+        )
     
+    @retry_external
     def _run_module(self, module_name: str, phone_number: str) -> Dict:
         """
         Run a specific intelligence module
         
+        Transient network errors are retried with backoff.
+        
         Args:
             module_name: Name of module to run
             phone_number: Phone number to analyze
@@ -148,6 +592,10 @@ class PhoneTracer:
         Returns:
             Module results
         """
+        if module_name == 'social':
+            from modules.social_media import detect_social_media
+            return detect_social_media(phone_number, detector=self._social_media_detector())
+        
         # This is a placeholder - actual implementation would import
         # and run the specific module from the modules/ directory
         return {
@@ -155,40 +603,445 @@ class PhoneTracer:
             'message': f'Module {module_name} not yet implemented'
         }
     
+    def _module_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool trace() runs modules on, creating it on first use
+        
+        The pool is kept for the life of the tracer, so repeated traces do
+        not pay for starting and joining threads.
+        
+        Returns:
+            Thread pool shared by all traces of this tracer
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=MAX_MODULE_WORKERS, thread_name_prefix='phonetracer-module'
+                )
+            return self._executor
+    
+    def _social_media_detector(self):
+        """
+        Get this tracer's social media detector, creating it on first use
+        
+        The detector's rate limiter is built from the rate_limit setting,
+        so all platform requests made for this tracer share one budget,
+        and each request is bounded by the timeout setting.
+        
+        Returns:
+            SocialMediaDetector instance
+        """
+        with self._lock:
+            if self._social_media is None:
+                from modules.social_media import SocialMediaDetector
+                self._social_media = SocialMediaDetector(
+                    rate_limit=self.config['rate_limit'],
+                    timeout=self.config['timeout']
+                )
+            return self._social_media
+    
+    async def _arun_module(self, module_name: str, phone_number: str) -> Dict:
+        """
+        Run a specific intelligence module asynchronously
+        
+        The module runs in the default executor so that it, and any
+        retry backoff, does not block the event loop.
+        
+        Args:
+            module_name: Name of module to run
+            phone_number: Phone number to analyze
+            
+        Returns:
+            Module results
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._run_module, module_name, phone_number)
+    
     def _get_timestamp(self) -> str:
         """
         Get current timestamp
         
         Returns:
-            ISO format timestamp
+            ISO format UTC timestamp with one-second resolution
         """
-        from datetime import datetime
-        return datetime.utcnow().isoformat()
+        return _timestamp_for_second(int(time.time()))
     
     def export_results(self, output_format: str = 'json', output_file: Optional[str] = None):
         """
         Export results to file
         
         Args:
-            output_format: Format (json, csv, html)
+            output_format: Format (json, csv, parquet, html)
             output_file: Output file path
         """
         if not self.results:
             logger.warning("No results to export")
             return
         
+        if output_format in BatchResults.FORMATS:
+            batch = BatchResults()
+            batch.append(self.results)
+            batch.export(output_format, output_file)
+            if output_file:
+                logger.info("Results exported to %s", output_file)
+            return
+        
         if output_format == 'json':
-            output = json.dumps(self.results, indent=2)
+            output = _dumps(self.results, indent=True)
         else:
-            logger.warning(f"Format {output_format} not yet implemented")
-            output = json.dumps(self.results, indent=2)
+            logger.warning("Format %s not yet implemented", output_format)
+            output = _dumps(self.results, indent=True)
         
         if output_file:
-            with open(output_file, 'w') as f:
+            with open(output_file, 'wb') as f:
                 f.write(output)
-            logger.info(f"Results exported to {output_file}")
+            logger.info("Results exported to %s", output_file)
         else:
-            print(output)
+            print(output.decode())
+
+
+# Per-process tracer used by _trace_one in worker processes
+_WORKER_TRACER: Optional[PhoneTracer] = None
+
+
+def _trace_one(item: Tuple[str, bool], config: Dict, modules: Optional[List[str]] = None) -> Dict:
+    """
+    Trace a single batch line in a worker process
+    
+    The tracer is built once per process and reused for every number
+    the process handles.
+    
+    Args:
+        item: Tuple of (phone number, whether it passed the prefilter)
+        config: Configuration of the parent tracer
+        modules: List of modules to use
+        
+    Returns:
+        Dictionary containing gathered intelligence
+    """
+    global _WORKER_TRACER
+    if _WORKER_TRACER is None:
+        _WORKER_TRACER = PhoneTracer(config=config)
+    phone_number, plausible = item
+    if not plausible:
+        return _WORKER_TRACER.rejected(phone_number)
+    return _WORKER_TRACER.trace(phone_number, modules=modules)
+
+
+def _trace_chunk(items: List[Tuple[str, bool]], config: Dict,
+                 modules: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Trace a chunk of batch lines in a worker process
+    
+    Args:
+        items: Tuples of (phone number, whether it passed the prefilter)
+        config: Configuration of the parent tracer
+        modules: List of modules to use
+        
+    Returns:
+        Results in input order
+    """
+    return [_trace_one(item, config, modules) for item in items]
+
+
+def _prefilter_numbers(lines: List[bytes]) -> List[bool]:
+    """
+    Flag batch lines whose digit count cannot be a phone number
+    
+    With NumPy the whole chunk is checked in one vectorized pass over
+    its bytes; without it the same rule is applied line by line.
+    
+    Args:
+        lines: Non-empty, stripped batch lines
+        
+    Returns:
+        Per line, whether it has between MIN_DIGITS and MAX_DIGITS
+        ASCII digits
+    """
+    if not lines:
+        return []
+    
+    np = _get_numpy()
+    if np is None:
+        return [
+            MIN_DIGITS <= sum(48 <= c <= 57 for c in line) <= MAX_DIGITS
+            for line in lines
+        ]
+    
+    data = np.frombuffer(b''.join(lines), dtype=np.uint8)
+    is_digit = ((data >= ord('0')) & (data <= ord('9'))).astype(np.int32)
+    lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    digits = np.add.reduceat(is_digit, starts)
+    return ((digits >= MIN_DIGITS) & (digits <= MAX_DIGITS)).tolist()
+
+
+def _iter_raw_blocks(f) -> Iterator[bytes]:
+    """
+    Read a binary file in BATCH_READ_BLOCK sized blocks
+    
+    Regular files are memory-mapped. Pipes, character devices and other
+    files that cannot be mapped are read through the file buffer.
+    
+    Args:
+        f: File opened in binary mode
+        
+    Yields:
+        Raw blocks of the file
+    """
+    mm = None
+    if stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and some filesystems cannot be mapped
+            mm = None
+    
+    if mm is None:
+        yield from iter(functools.partial(f.read, BATCH_READ_BLOCK), b'')
+        return
+    
+    with mm:
+        for start in range(0, len(mm), BATCH_READ_BLOCK):
+            yield mm[start:start + BATCH_READ_BLOCK]
+
+
+def _iter_line_blocks(f) -> Iterator[List[bytes]]:
+    """
+    Read a batch file and split it into lines block by block
+    
+    Each block is split on newlines in one call; a line straddling two
+    blocks is carried over to the next one.
+    
+    Args:
+        f: Batch file opened in binary mode
+        
+    Yields:
+        Lists of non-empty, stripped lines
+    """
+    tail = b''
+    for block in _iter_raw_blocks(f):
+        lines = (tail + block).split(b'\n')
+        tail = lines.pop()
+        yield [line for line in map(bytes.strip, lines) if line]
+    tail = tail.strip()
+    if tail:
+        yield [tail]
+
+
+def iter_phone_numbers(f) -> Iterator[Tuple[str, bool]]:
+    """
+    Lazily read phone numbers from a batch file
+    
+    The file is read in blocks (memory-mapped when it is a regular
+    file), and each block's lines are run through _prefilter_numbers,
+    so obviously malformed lines can skip tracing.
+    
+    Args:
+        f: Batch file opened in binary mode (one phone number per line)
+        
+    Yields:
+        Tuples of (stripped line, whether it passed the prefilter)
+    """
+    for lines in _iter_line_blocks(f):
+        for line, plausible in zip(lines, _prefilter_numbers(lines)):
+            yield line.decode('utf-8', errors='replace'), plausible
+
+
+def _emit_result(result: Dict, out, batch: Optional[BatchResults] = None):
+    """
+    Report a finished trace and append it to the batch output
+    
+    Args:
+        result: Trace result
+        out: Binary output file, or None
+        batch: Column store to add the result to, or None
+    """
+    if sys.stdout.isatty():
+        print(f"\n{Fore.GREEN}[*] Processed: {result['phone_number']}{Style.RESET_ALL}")
+    if out:
+        out.write(_dumps(result) + b'\n')
+        out.flush()
+    if batch is not None:
+        batch.append(result)
+
+
+async def _write_results(queue: 'asyncio.Queue', out,
+                         batch: Optional[BatchResults] = None) -> int:
+    """
+    Single writer draining trace results from a queue
+    
+    Each result is appended to out as one JSON Lines record as soon as
+    it arrives. A None item marks the end of the batch.
+    
+    Args:
+        queue: Queue of trace results
+        out: Binary output file, or None
+        batch: Column store to add each result to, or None
+        
+    Returns:
+        Number of results written
+    """
+    count = 0
+    while True:
+        result = await queue.get()
+        if result is None:
+            return count
+        _emit_result(result, out, batch)
+        count += 1
+
+
+def _run(coro):
+    """
+    Run a coroutine on a fresh event loop
+    
+    Uses the libuv-based uvloop where available (not supported on
+    Windows) without changing the global event loop policy. uvloop is
+    imported here so that single-number runs do not load it.
+    
+    Args:
+        coro: Coroutine to run
+        
+    Returns:
+        Result of the coroutine
+    """
+    import asyncio
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    if uvloop is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    
+    # Same cleanup as asyncio.run() for Pythons without asyncio.Runner
+    return uvloop.run(coro)
+
+
+async def trace_batch(tracer: PhoneTracer, phone_numbers: Iterable[Tuple[str, bool]],
+                      modules: Optional[List[str]] = None,
+                      output_file: Optional[str] = None,
+                      batch: Optional[BatchResults] = None) -> int:
+    """
+    Trace many phone numbers concurrently
+    
+    phone_numbers is consumed lazily, and results are streamed to
+    output_file as JSON Lines in completion order, so memory use does
+    not grow with the batch size. If writing fails, outstanding traces
+    are cancelled and the error is raised.
+    
+    Args:
+        tracer: PhoneTracer instance shared by all traces
+        phone_numbers: Tuples of (phone number, whether it passed the
+            prefilter), as yielded by iter_phone_numbers()
+        modules: List of modules to use for every number
+        output_file: Optional JSON Lines output file path
+        batch: Column store to collect results into, or None
+        
+    Returns:
+        Number of phone numbers processed
+    """
+    # asyncio and aiometer (with anyio under it) are only needed for
+    # batches, so they are not imported with the module
+    import asyncio
+    import aiometer
+    
+    # Open the output up front so a bad path fails before any tracing
+    out = open(output_file, 'wb') if output_file else None
+    try:
+        queue = asyncio.Queue(maxsize=BATCH_MAX_AT_ONCE)
+        
+        async def trace_one(item: Tuple[str, bool]):
+            phone_number, plausible = item
+            if plausible:
+                result = await tracer.atrace(phone_number, modules=modules)
+            else:
+                result = tracer.rejected(phone_number)
+            await queue.put(result)
+        
+        async def produce():
+            await aiometer.run_on_each(
+                trace_one,
+                phone_numbers,
+                max_at_once=BATCH_MAX_AT_ONCE,
+                max_per_second=BATCH_MAX_PER_SECOND
+            )
+            await queue.put(None)
+        
+        writer = asyncio.ensure_future(_write_results(queue, out, batch))
+        producer = asyncio.ensure_future(produce())
+        try:
+            # The writer only finishes early if it failed; producers would
+            # otherwise block forever on the full queue
+            await asyncio.wait({writer, producer}, return_when=asyncio.FIRST_COMPLETED)
+            if writer.done():
+                producer.cancel()
+                return writer.result()
+            producer.result()
+            return await writer
+        finally:
+            producer.cancel()
+            writer.cancel()
+    finally:
+        if out:
+            out.close()
+
+
+def trace_batch_parallel(tracer: PhoneTracer, phone_numbers: Iterable[Tuple[str, bool]],
+                         modules: Optional[List[str]] = None,
+                         output_file: Optional[str] = None,
+                         workers: Optional[int] = None,
+                         batch: Optional[BatchResults] = None) -> int:
+    """
+    Trace many phone numbers across worker processes
+    
+    Suited to large batches where CPU-bound parsing and validation
+    dominate. Results are written to output_file as JSON Lines in input
+    order.
+    
+    Args:
+        tracer: PhoneTracer whose configuration the workers use
+        phone_numbers: Tuples of (phone number, whether it passed the
+            prefilter), as yielded by iter_phone_numbers()
+        modules: List of modules to use for every number
+        output_file: Optional JSON Lines output file path
+        workers: Number of worker processes (default: CPU count)
+        batch: Column store to collect results into, or None
+        
+    Returns:
+        Number of phone numbers processed
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    workers = workers or os.cpu_count() or 1
+    items = iter(phone_numbers)
+    pending = deque()
+    count = 0
+    out = open(output_file, 'wb') if output_file else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Submit in a bounded window of chunks so the input stays
+            # streamed and only a few chunks of results are held at once
+            while True:
+                chunk = list(itertools.islice(items, BATCH_CHUNKSIZE))
+                if chunk:
+                    pending.append(executor.submit(_trace_chunk, chunk, tracer.config, modules))
+                if pending and (not chunk or len(pending) >= workers * 2):
+                    for result in pending.popleft().result():
+                        _emit_result(result, out, batch)
+                        count += 1
+                elif not chunk:
+                    break
+    finally:
+        if out:
+            out.close()
+    
+    return count
 
 
 def print_banner():
@@ -222,7 +1075,7 @@ def main():
     parser.add_argument(
         '--modules', '-m',
         nargs='+',
-        help='Specific modules to run (carrier, location, spam, validator)'
+        help='Specific modules to run (carrier, location, social, spam, validator)'
     )
     
     parser.add_argument(
@@ -237,7 +1090,7 @@ def main():
     
     parser.add_argument(
         '--format', '-f',
-        choices=['json', 'csv', 'html'],
+        choices=['json', 'csv', 'parquet', 'html'],
         default='json',
         help='Output format (default: json)'
     )
@@ -247,6 +1100,13 @@ def main():
         help='Batch process from file (one phone number per line)'
     )
     
+    parser.add_argument(
+        '--processes', '-p',
+        type=int,
+        metavar='N',
+        help='Trace batch numbers across N worker processes instead of asynchronously'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -273,27 +1133,48 @@ def main():
         parser.print_help()
         sys.exit(1)
     
+    # Parquet is binary and cannot be printed, so fail before tracing
+    if args.format == 'parquet' and not args.output:
+        parser.error("--format parquet requires --output")
+    
     # Initialize PhoneTracer
     tracer = PhoneTracer(config_file=args.config)
     
     try:
         if args.batch:
             # Batch processing
-            logger.info(f"Batch processing from {args.batch}")
-            with open(args.batch, 'r') as f:
-                phone_numbers = [line.strip() for line in f if line.strip()]
+            logger.info("Batch processing from %s", args.batch)
             
-            all_results = []
-            for phone_number in phone_numbers:
-                print(f"\n{Fore.GREEN}[*] Processing: {phone_number}{Style.RESET_ALL}")
-                result = tracer.trace(phone_number, modules=args.modules)
-                all_results.append(result)
+            # Columnar formats are collected and written at the end;
+            # everything else is streamed as JSON Lines
+            if args.format in BatchResults.FORMATS:
+                batch = BatchResults()
+                output_file = None
+            else:
+                batch = None
+                output_file = args.output
             
-            # Export batch results
+            # Open the batch file before tracing starts, so a bad path is
+            # reported as is rather than from inside the task group
+            with open(args.batch, 'rb') as batch_file:
+                phone_numbers = iter_phone_numbers(batch_file)
+                
+                # Trace concurrently, streaming results to the output file
+                if args.processes:
+                    count = trace_batch_parallel(
+                        tracer, phone_numbers, modules=args.modules,
+                        output_file=output_file, workers=args.processes, batch=batch
+                    )
+                else:
+                    count = _run(
+                        trace_batch(tracer, phone_numbers, modules=args.modules,
+                                    output_file=output_file, batch=batch)
+                    )
+            logger.info("Batch processed %d phone numbers", count)
+            if batch is not None:
+                batch.export(args.format, args.output)
             if args.output:
-                with open(args.output, 'w') as f:
-                    json.dump(all_results, f, indent=2)
-                logger.info(f"Batch results exported to {args.output}")
+                logger.info("Batch results exported to %s", args.output)
         else:
             # Single number processing
             results = tracer.trace(args.phone_number, modules=args.modules)
@@ -310,7 +1191,7 @@ def main():
         print(f"\n{Fore.YELLOW}[!] Operation cancelled by user{Style.RESET_ALL}")
         sys.exit(130)
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.error("Error: %s", e)
         print(f"{Fore.RED}[✗] An error occurred. Check logs for details.{Style.RESET_ALL}")
         sys.exit(1)
 
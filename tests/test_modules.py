@@ -0,0 +1,182 @@
+"""Tests for the intelligence modules"""
+
+import asyncio
+import time
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+
+from aiolimiter import AsyncLimiter
+
+from modules import social_media
+from modules._retry import is_transient
+from modules.social_media import SocialMediaDetector, _tighten_limiter
+from phonetracer import PhoneTracer
+
+
+def test_tighten_limiter_spreads_remaining_budget():
+    limiter = AsyncLimiter(60, 60)
+
+    deadline = _tighten_limiter(limiter, {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': '10'})
+
+    assert limiter._rate_per_sec == pytest.approx(0.5)
+    assert deadline == pytest.approx(time.monotonic() + 10, abs=1)
+
+
+def test_tighten_limiter_accepts_epoch_reset():
+    limiter = AsyncLimiter(60, 60)
+
+    _tighten_limiter(limiter, {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': str(time.time() + 10)})
+
+    assert limiter._rate_per_sec == pytest.approx(0.5, rel=0.05)
+
+
+def test_tighten_limiter_never_exceeds_configured_rate():
+    limiter = AsyncLimiter(60, 60)
+
+    _tighten_limiter(limiter, {'X-RateLimit-Remaining': '1000', 'X-RateLimit-Reset': '1'})
+
+    assert limiter._rate_per_sec == 1.0
+
+
+def test_tighten_limiter_ignores_missing_headers():
+    limiter = AsyncLimiter(60, 60)
+
+    assert _tighten_limiter(limiter, {}) is None
+    assert _tighten_limiter(limiter, {'X-RateLimit-Remaining': 'x', 'X-RateLimit-Reset': '1'}) is None
+    assert limiter._rate_per_sec == 1.0
+
+
+def test_fetch_restores_rate_after_reset():
+    headers = {'X-RateLimit-Remaining': '1', 'X-RateLimit-Reset': '10'}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={}, headers=headers))
+    detector = SocialMediaDetector(rate_limit=600)
+
+    async def fetch_twice():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await detector._fetch(client, 'https://example.com')
+            assert detector._limiter._rate_per_sec == pytest.approx(0.1)
+
+            # Jump past the reset time; the next response carries no rate limit headers
+            headers.clear()
+            detector._throttled_until = time.monotonic() - 1
+            await detector._fetch(client, 'https://example.com')
+            assert detector._limiter._rate_per_sec == 10.0
+
+    asyncio.run(fetch_twice())
+
+
+def test_tracer_social_module_uses_configured_limits():
+    tracer = PhoneTracer(config={
+        'timeout': 5,
+        'rate_limit': 120,
+        'cache_enabled': False,
+        'cache_url': None,
+        'cache_ttl': 86400,
+        'verbose': False
+    })
+
+    result = tracer.trace('+14155550100', modules=['social'])
+
+    assert set(result['data']['social']['details']) == set(SocialMediaDetector.PLATFORMS)
+    assert tracer._social_media_detector()._limiter.max_rate == 120
+    assert tracer._social_media_detector().timeout == 5
+
+
+def test_check_all_platforms_tolerates_missing_flags():
+    detector = SocialMediaDetector()
+
+    async def generic(client, phone_number, platform):
+        return {'possible': True} if platform == 'TikTok' else {'note': 'no flag'}
+
+    detector._check_generic_platform = generic
+
+    result = asyncio.run(detector.check_all_platforms('+14155550100'))
+
+    assert result['platforms_found'] == ['TikTok']
+    assert list(result['details']) == list(SocialMediaDetector.PLATFORMS)
+
+
+def test_check_all_platforms_reports_failed_platform():
+    detector = SocialMediaDetector()
+
+    async def not_found(client, phone_number, platform):
+        if platform == 'Viber':
+            request = httpx.Request('GET', 'https://example.com')
+            raise httpx.HTTPStatusError('404 Not Found', request=request,
+                                        response=httpx.Response(404, request=request))
+        return {'possible': platform == 'TikTok'}
+
+    detector._check_generic_platform = not_found
+
+    result = asyncio.run(detector.check_all_platforms('+14155550100'))
+
+    assert result['details']['Viber'] == {'error': '404 Not Found'}
+    assert result['details']['TikTok'] == {'possible': True}
+    assert len(result['details']) == len(SocialMediaDetector.PLATFORMS)
+
+
+def _status_error(status_code):
+    request = httpx.Request('GET', 'https://example.com')
+    return httpx.HTTPStatusError(str(status_code), request=request,
+                                 response=httpx.Response(status_code, request=request))
+
+
+@pytest.mark.parametrize('exc', [
+    asyncio.TimeoutError(),
+    httpx.ConnectTimeout('timed out'),
+    httpx.ReadTimeout('timed out'),
+    httpx.ConnectError('refused'),
+    httpx.ReadError('reset'),
+    httpx.RemoteProtocolError('server closed connection'),
+    _status_error(429),
+    _status_error(503),
+])
+def test_is_transient_retries_temporary_failures(exc):
+    assert is_transient(exc)
+
+
+@pytest.mark.parametrize('exc', [
+    httpx.UnsupportedProtocol('ftp'),
+    httpx.LocalProtocolError('bad header'),
+    _status_error(401),
+    _status_error(404),
+    ValueError('bad input'),
+])
+def test_is_transient_gives_up_on_permanent_failures(exc):
+    assert not is_transient(exc)
+
+
+def test_sync_entry_point_runs_on_uvloop():
+    uvloop = pytest.importorskip('uvloop')
+
+    result = social_media.detect_social_media('+14155550100')
+
+    assert isinstance(social_media._get_loop(), uvloop.Loop)
+    assert len(result['details']) == len(SocialMediaDetector.PLATFORMS)
+
+
+def test_aclose_client_closes_the_loop_client():
+    async def detect():
+        await social_media.adetect_social_media('+14155550100')
+        client = social_media.get_client()
+        await social_media.aclose_client()
+        return client
+
+    client = asyncio.run(detect())
+
+    assert client.is_closed
+    assert client not in social_media._CLIENTS.values()
+
+
+def test_unclosed_client_of_closed_loop_is_reported(caplog):
+    asyncio.run(social_media.adetect_social_media('+14155550100'))
+
+    async def next_call():
+        social_media.get_client()
+        await social_media.aclose_client()
+
+    asyncio.run(next_call())
+
+    assert 'without aclose_client()' in caplog.text
@@ -0,0 +1,313 @@
+"""Tests for the batch reading, caching and export helpers in phonetracer"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import phonetracer
+from phonetracer import BatchResults, PhoneTracer
+
+
+LINES = [b'+14155550100', b'+44 20 7946 0958', b'hello', b'12', b'+1 (415) 555-0199']
+
+
+class FakeCache:
+    """In-memory stand-in for the Redis client"""
+
+    def __init__(self):
+        self.store = {}
+        self.writes = 0
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.writes += 1
+        self.store[key] = value
+
+
+@pytest.fixture
+def tracer():
+    return PhoneTracer(config={
+        'timeout': 30,
+        'rate_limit': 60,
+        'cache_enabled': False,
+        'cache_url': None,
+        'cache_ttl': 86400,
+        'verbose': False
+    })
+
+
+def test_line_straddling_block_boundary(tmp_path, monkeypatch):
+    monkeypatch.setattr(phonetracer, 'BATCH_READ_BLOCK', 8)
+    path = tmp_path / 'numbers.txt'
+    path.write_bytes(b'\n'.join(LINES))
+
+    with open(path, 'rb') as f:
+        lines = [line for block in phonetracer._iter_line_blocks(f) for line in block]
+
+    assert lines == LINES
+
+
+def test_line_straddling_block_boundary_from_pipe(monkeypatch):
+    monkeypatch.setattr(phonetracer, 'BATCH_READ_BLOCK', 8)
+    read_fd, write_fd = os.pipe()
+
+    def feed():
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(b'\n'.join(LINES) + b'\n')
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    try:
+        with os.fdopen(read_fd, 'rb') as f:
+            lines = [line for block in phonetracer._iter_line_blocks(f) for line in block]
+    finally:
+        writer.join()
+
+    assert lines == LINES
+
+
+def test_prefilter_matches_without_numpy(monkeypatch):
+    pytest.importorskip('numpy')
+    lines = LINES + [b'1234567', b'123456', b'1' * 15, b'1' * 16, b'x']
+
+    with_numpy = phonetracer._prefilter_numbers(lines)
+    monkeypatch.setattr(phonetracer, '_get_numpy', lambda: None)
+    without_numpy = phonetracer._prefilter_numbers(lines)
+
+    assert with_numpy == without_numpy
+    assert with_numpy == [True, True, False, False, True, True, False, True, False, False]
+
+
+def test_cache_key_ignores_module_order(tracer):
+    key = tracer._cache_key('+14155550100', ['carrier', 'location'])
+
+    assert key == tracer._cache_key('+14155550100', ['location', 'carrier'])
+    assert key != tracer._cache_key('+14155550100', ['carrier'])
+    assert key != tracer._cache_key('+14155550101', ['carrier', 'location'])
+    assert key.startswith(b'pt:')
+
+
+def test_cache_hit_keeps_number_and_timestamp(tracer):
+    tracer.cache = FakeCache()
+
+    first = tracer.trace('+14155550100')
+    second = tracer.trace('+1 415-555-0100')
+
+    assert tracer.cache.writes == 1
+    assert second['phone_number'] == '+1 415-555-0100'
+    assert second['data'] == first['data']
+    assert 'timestamp' in second
+
+
+def test_batch_results_export_csv(tracer, tmp_path):
+    pytest.importorskip('pandas')
+    batch = BatchResults()
+    batch.append(tracer.trace('+14155550100'))
+    batch.append(tracer.rejected('hello'))
+    path = tmp_path / 'results.csv'
+
+    batch.export('csv', str(path))
+
+    rows = path.read_text().splitlines()
+    assert rows[0] == 'phone_number,timestamp,e164,country_code,national_number,is_valid,is_possible'
+    assert rows[1].startswith('+14155550100,')
+    assert rows[2].startswith('hello,')
+    assert batch.invalid_numbers() == ['hello']
+
+
+def test_batch_results_export_parquet(tracer, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    batch = BatchResults()
+    batch.append(tracer.trace('+14155550100'))
+    path = tmp_path / 'results.parquet'
+
+    batch.export('parquet', str(path))
+
+    table = pq.read_table(str(path)).to_pydict()
+    assert table['phone_number'] == ['+14155550100']
+    assert table['country_code'] == [1]
+    assert table['national_number'] == [4155550100]
+
+
+def test_batch_results_parquet_requires_file():
+    with pytest.raises(ValueError):
+        BatchResults().export('parquet')
+
+
+def test_batch_results_append_after_columns(tracer):
+    batch = BatchResults()
+    batch.append(tracer.trace('+14155550100'))
+    columns = batch.columns()
+
+    batch.append(tracer.trace('+442079460958'))
+
+    assert len(batch) == 2
+    assert len(columns['country_code']) == 1
+
+
+def test_failed_module_is_not_cached(tracer):
+    tracer.cache = FakeCache()
+    run_module = tracer._run_module
+
+    def upstream_down(module_name, phone_number):
+        raise RuntimeError('upstream down')
+
+    tracer._run_module = upstream_down
+    failed = tracer.trace('+14155550100', modules=['carrier'])
+    tracer._run_module = run_module
+    second = tracer.trace('+14155550100', modules=['carrier'])
+
+    assert failed['data']['carrier'] == {'error': 'upstream down'}
+    assert 'error' not in second['data']['carrier']
+    assert tracer.cache.writes == 1
+
+
+def test_atrace_keeps_cache_io_off_the_event_loop(tracer):
+    cache = tracer.cache = FakeCache()
+    threads = []
+    get, setex = cache.get, cache.setex
+    cache.get = lambda key: threads.append(threading.get_ident()) or get(key)
+    cache.setex = lambda *args: threads.append(threading.get_ident()) or setex(*args)
+
+    async def trace_twice():
+        await tracer.atrace('+14155550100')
+        return await tracer.atrace('+14155550100'), threading.get_ident()
+
+    result, loop_thread = asyncio.run(trace_twice())
+
+    assert len(threads) == 3
+    assert loop_thread not in threads
+    assert result['phone_number'] == '+14155550100'
+
+
+def test_trace_batch_streams_every_line(tracer, tmp_path):
+    path = tmp_path / 'numbers.txt'
+    path.write_bytes(b'\n'.join(LINES))
+    output = tmp_path / 'results.jsonl'
+
+    with open(path, 'rb') as f:
+        count = asyncio.run(phonetracer.trace_batch(
+            tracer, phonetracer.iter_phone_numbers(f), output_file=str(output)
+        ))
+
+    records = [phonetracer._loads(line) for line in output.read_bytes().splitlines()]
+    assert count == len(LINES)
+    assert sorted(r['phone_number'] for r in records) == sorted(l.decode() for l in LINES)
+
+
+def test_trace_batch_raises_when_writer_fails(tracer, monkeypatch):
+    def disk_full(result, out, batch=None):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(phonetracer, '_emit_result', disk_full)
+    items = (('+14155550100', True) for _ in range(phonetracer.BATCH_MAX_AT_ONCE * 4))
+
+    async def run():
+        return await asyncio.wait_for(phonetracer.trace_batch(tracer, items), timeout=10)
+
+    with pytest.raises(OSError, match='No space left'):
+        asyncio.run(run())
+
+
+def test_trace_batch_bad_output_path_fails_before_tracing(tracer, tmp_path):
+    items = iter([('+14155550100', True)])
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(phonetracer.trace_batch(
+            tracer, items, output_file=str(tmp_path / 'missing' / 'out.jsonl')
+        ))
+    assert next(items) == ('+14155550100', True)
+
+
+def test_main_reports_missing_batch_file(tmp_path, monkeypatch, caplog):
+    missing = str(tmp_path / 'missing.txt')
+    monkeypatch.setattr('sys.argv', ['phonetracer.py', '-b', missing])
+
+    with pytest.raises(SystemExit):
+        phonetracer.main()
+
+    assert 'No such file or directory' in caplog.text
+
+
+def test_trace_reuses_module_executor(tracer):
+    tracer.trace('+14155550100')
+    executor = tracer._module_executor()
+    tracer.trace('+442079460958')
+
+    assert tracer._module_executor() is executor
+
+
+def test_import_keeps_async_and_batch_dependencies_out():
+    code = ("import sys, phonetracer; "
+            "print(sorted(m for m in ('aiometer', 'asyncio', 'httpx', 'numpy', 'uvloop') "
+            "if m in sys.modules))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    output = subprocess.run([sys.executable, '-c', code], cwd=root,
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == '[]'
+
+
+def test_trace_batch_parallel_bounds_pending_work_and_keeps_order(tracer, monkeypatch):
+    monkeypatch.setattr(phonetracer, 'BATCH_CHUNKSIZE', 3)
+    numbers = ['+1415555%04d' % i for i in range(60)]
+    consumed = []
+
+    def items():
+        for i, number in enumerate(numbers):
+            consumed.append(number)
+            yield number, i % 7 != 0
+
+    emit_result = phonetracer._emit_result
+    consumed_at_first_emit = []
+
+    def emit(result, out, batch=None):
+        consumed_at_first_emit.append(len(consumed))
+        emit_result(result, out, batch)
+
+    monkeypatch.setattr(phonetracer, '_emit_result', emit)
+    batch = BatchResults()
+
+    count = phonetracer.trace_batch_parallel(tracer, items(), workers=2, batch=batch)
+
+    assert count == len(numbers)
+    assert batch.phone_numbers == numbers
+    # Two workers keep at most four chunks of three numbers pending
+    assert consumed_at_first_emit[0] <= 2 * 2 * 3
+
+
+@pytest.mark.parametrize('phone_number', ['hello', '12', '+1 415 555 0100 x12', '1' * 21, '++14155550100'])
+def test_parse_number_rejects_malformed_input_before_phonenumbers(phone_number, monkeypatch):
+    def parse(*args):
+        raise AssertionError('phonenumbers.parse should not be reached')
+
+    monkeypatch.setattr(phonetracer.phonenumbers, 'parse', parse)
+
+    assert phonetracer._parse_number(phone_number) is None
+
+
+@pytest.mark.parametrize('phone_number', ['+14155550100', '+1 (415) 555-0100', '+44 20.7946.0958'])
+def test_parse_number_accepts_formatted_numbers(phone_number):
+    parsed = phonetracer._parse_number(phone_number)
+
+    assert parsed is not None
+    assert parsed['is_valid']
+
+
+def test_run_uses_uvloop_and_cancels_leftover_tasks():
+    uvloop = pytest.importorskip('uvloop')
+    leftover = []
+
+    async def main():
+        leftover.append(asyncio.ensure_future(asyncio.sleep(3600)))
+        return type(asyncio.get_running_loop())
+
+    assert issubclass(phonetracer._run(main()), uvloop.Loop)
+    assert leftover[0].cancelled()